@@ -9,14 +9,18 @@ from strands import Agent
 from strands.models.anthropic import AnthropicModel
 from app.agents.tools.content_fetcher import fetch_url_content
 from app.agents.tools.tagging import normalize_tags
-from app.agents.tools.embedding import generate_embedding
+from app.agents.tools.embedding import generate_embedding_np
 from app.agents.tools.database_ops import add_note
 from app.agents.tools.search import find_similar_notes
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ContentAnalysis(BaseModel):
     """Structured output for content analysis."""
+    # Analyses are read-only once produced. Trusted data (e.g. tests) can use
+    # model_construct() to skip validation entirely; untrusted input must not.
+    model_config = ConfigDict(frozen=True)
+    
     title: str = Field(description="Generated or extracted title for the content")
     summary: str = Field(description="Concise summary (120-180 words)")
     tags: List[str] = Field(description="5-10 semantic tags (lowercase, no punctuation)")
@@ -178,8 +182,8 @@ Content: {content[:4000]}  # Limit content length for Claude
         # Normalize tags
         normalized_tags = normalize_tags(tags) if tags else []
         
-        # Generate embedding
-        embedding = generate_embedding(content)
+        # Generate embedding; the ndarray goes to the Vector column as-is
+        embedding = generate_embedding_np(content)
         
         # Store in database
         try:
@@ -4,11 +4,12 @@ Refactored from db/crud.py to be used by Strands agents.
 """
 
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 from db.models import Note
 import os
 from dotenv import load_dotenv
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
+import numpy as np
 import datetime
 
 load_dotenv()
@@ -17,21 +18,16 @@ engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine)
 
 
-def add_note(title: str, content: str, summary: str, tags: List[str], embedding: List[float]) -> Note:
+def add_note(title: str, content: str, summary: str, tags: List[str],
+             embedding: Union[List[float], np.ndarray]) -> Note:
     """Add a new note to the database."""
     session = SessionLocal()
-    note = Note(
-        title=title,
-        content=content,
-        summary=summary,
-        tags=tags,
-        embedding=embedding
-    )
-    session.add(note)
+    values = dict(title=title, content=content, summary=summary, tags=tags, embedding=embedding)
+    # INSERT ... RETURNING hands back the generated id/created_at without a refresh SELECT
+    row = session.execute(insert(Note).values(**values).returning(Note.id, Note.created_at)).one()
     session.commit()
-    session.refresh(note)
     session.close()
-    return note
+    return Note(id=row.id, created_at=row.created_at, **values)
 
 
 def get_all_notes() -> List[Note]:
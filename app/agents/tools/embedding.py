@@ -3,14 +3,76 @@ Embedding utilities for agents.
 Refactored from embeddings/embed_articles.py to be used by Strands agents.
 """
 
+import os
+import threading
+import torch
 from sentence_transformers import SentenceTransformer
 from typing import List, Union
+import math
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # optional; compute_similarity falls back to NumPy
+    njit = None
+
+try:
+    import hnswlib
+except ImportError:  # optional; only needed for build_index/search_index
+    hnswlib = None
+
 
 # Load a pre-trained embedding model
-# 'all-MiniLM-L6-v2' is lightweight and fast, good for MVP
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# 'all-MiniLM-L6-v2' is lightweight and fast, good for MVP.
+# Override with EMBEDDING_MODEL (e.g. 'paraphrase-MiniLM-L3-v2') to swap in a smaller distilled model.
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# EMBEDDING_BACKEND=onnx runs the model's dynamically quantized INT8 ONNX export
+# through ONNX Runtime (needs `pip install sentence-transformers[onnx]`)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+# Loaded on first use by _get_model() so importing this module stays cheap;
+# tests patch `model` directly and the loader never runs
+model = None
+_model_lock = threading.Lock()
+
+
+def _load_model() -> SentenceTransformer:
+    """Build the SentenceTransformer for the configured backend."""
+    # Split the cores between server workers for intra-op parallelism in encode
+    # (WORKERS is exported by start_merlin.py; EMBEDDING_THREADS overrides)
+    workers = int(os.getenv("WORKERS", 1))
+    default_threads = max(1, (os.cpu_count() or 4) // max(1, workers))
+    torch.set_num_threads(int(os.getenv("EMBEDDING_THREADS", default_threads)))
+    
+    if EMBEDDING_BACKEND == "onnx":
+        return SentenceTransformer(EMBEDDING_MODEL, backend="onnx", model_kwargs={"file_name": EMBEDDING_ONNX_FILE})
+    
+    loaded = SentenceTransformer(EMBEDDING_MODEL)
+    
+    # Opt-in half-precision inference on GPU (MERLIN_EMBEDDING_FP16=1)
+    if os.getenv("MERLIN_EMBEDDING_FP16") == "1" and torch.cuda.is_available():
+        loaded = loaded.half().to("cuda")
+    return loaded
+
+
+def _get_model() -> SentenceTransformer:
+    """Return the embedding model, loading it on first call."""
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                model = _load_model()
+    return model
+
+
+def generate_embedding_np(text: str) -> np.ndarray:
+    """
+    Generate a vector embedding for the given text as the model's ndarray.
+    Use this for in-process similarity work to skip the list round-trip.
+    """
+    return _get_model().encode([text])[0]  # model.encode returns a list of vectors
 
 
 def generate_embedding(text: str) -> List[float]:
@@ -18,15 +80,23 @@ def generate_embedding(text: str) -> List[float]:
     Generate a vector embedding for the given text using Hugging Face.
     Returns a list of floats.
     """
-    embedding = model.encode([text])[0]  # model.encode returns a list of vectors
-    return embedding.tolist()  # convert numpy array to list for pgvector storage
+    return generate_embedding_np(text).tolist()  # convert numpy array to list for pgvector storage
+
+
+def generate_embeddings_batch_np(texts: List[str]) -> np.ndarray:
+    """
+    Generate embeddings for multiple texts as the model's (N, D) ndarray.
+    """
+    # No pre-sorting needed: SentenceTransformer.encode already groups texts by
+    # length to minimise padding and returns rows in the caller's order
+    return _get_model().encode(texts)
 
 
 def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
     """
     Generate embeddings for multiple texts efficiently.
     """
-    embeddings = model.encode(texts)
+    embeddings = generate_embeddings_batch_np(texts)
     return [embedding.tolist() for embedding in embeddings]
 
 
@@ -34,29 +104,175 @@ def compute_similarity(embedding1: List[float], embedding2: List[float]) -> floa
     """
     Compute cosine similarity between two embeddings.
     """
-    vec1 = np.array(embedding1)
-    vec2 = np.array(embedding2)
+    vec1 = np.asarray(embedding1, dtype=np.float32)
+    vec2 = np.asarray(embedding2, dtype=np.float32)
     
-    # Handle different dimensions by padding with zeros
+    # Handle different dimensions by comparing the shared leading components
     if len(vec1) != len(vec2):
-        max_len = max(len(vec1), len(vec2))
-        if len(vec1) < max_len:
-            vec1 = np.pad(vec1, (0, max_len - len(vec1)), mode='constant')
-        if len(vec2) < max_len:
-            vec2 = np.pad(vec2, (0, max_len - len(vec2)), mode='constant')
-    
-    # Compute cosine similarity
-    dot_product = np.dot(vec1, vec2)
-    norm1 = np.linalg.norm(vec1)
-    norm2 = np.linalg.norm(vec2)
-    
-    if norm1 == 0 or norm2 == 0:
+        n = min(len(vec1), len(vec2))
+        vec1, vec2 = vec1[:n], vec2[:n]
+    
+    return compute_similarity_arr(vec1, vec2)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _cos384(a, b):
+        """Fused single-loop cosine similarity for 384-dim vectors."""
+        dot = aa = bb = 0.0
+        for i in range(a.shape[0]):
+            dot += a[i] * b[i]
+            aa += a[i] * a[i]
+            bb += b[i] * b[i]
+        if aa == 0.0 or bb == 0.0:
+            return 0.0
+        return dot / math.sqrt(aa * bb)
+else:
+    _cos384 = None
+
+
+def compute_similarity_arr(vec1: np.ndarray, vec2: np.ndarray) -> float:
+    """
+    Compute cosine similarity between two same-length ndarrays.
+    Skips the list conversion and truncation done by compute_similarity.
+    """
+    # Model-sized vectors take the numba kernel when numba is installed
+    if _cos384 is not None and vec1.shape == (384,) and vec2.shape == (384,):
+        return float(_cos384(vec1, vec2))
+    
+    # Squared norms via np.vdot, one sqrt for both; multiplied as Python floats
+    # (double precision) so tiny or huge float32 norms don't under/overflow
+    denom = math.sqrt(float(np.vdot(vec1, vec1)) * float(np.vdot(vec2, vec2)))
+    
+    if denom == 0:
         return 0.0
     
     # Convert numpy float to Python float for JSON serialization
-    return float(dot_product / (norm1 * norm2))
+    return float(np.dot(vec1, vec2) / denom)
+
+
+def compute_similarity_matrix(embeddings1, embeddings2) -> np.ndarray:
+    """
+    Compute pairwise cosine similarity between two sets of embeddings.
+    Returns an (N, M) float32 array for (N, D) and (M, D) inputs; one matmul
+    instead of N * M compute_similarity calls.
+    """
+    mat1 = np.asarray(embeddings1, dtype=np.float32)
+    mat2 = np.asarray(embeddings2, dtype=np.float32)
+    
+    # Normalize rows once; clipping keeps zero rows at similarity 0.0
+    mat1 = mat1 / np.linalg.norm(mat1, axis=1, keepdims=True).clip(min=1e-12)
+    mat2 = mat2 / np.linalg.norm(mat2, axis=1, keepdims=True).clip(min=1e-12)
+    
+    return mat1 @ mat2.T
+
+
+_FP16_MAX = float(np.finfo(np.float16).max)
+
+
+class EmbeddingStore:
+    """
+    In-memory embeddings kept as one contiguous (N, D) matrix, with each row's
+    L2 norm computed once at insert time for repeated similarity queries.
+    
+    precision="fp16" stores rows as float16 (half the memory and bandwidth);
+    values beyond the float16 range are clipped on insert, and queries upcast
+    one block of rows at a time to compute in float32.
+    """
+    
+    # Rows upcast per step in query(), bounding the float32 temporary
+    _BLOCK_ROWS = 4096
+    
+    def __init__(self, dimension: int = 384, precision: str = "fp32"):
+        if precision not in ("fp16", "fp32"):
+            raise ValueError(f"Unknown precision: {precision}")
+        self.dimension = dimension
+        self._dtype = np.float16 if precision == "fp16" else np.float32
+        self._mat = np.empty((0, dimension), dtype=self._dtype)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, text: str) -> int:
+        """Embed text and store it. Returns its row index."""
+        return self.add_embedding(generate_embedding_np(text))
+    
+    def add_embedding(self, embedding) -> int:
+        """Store an existing embedding. Returns its row index."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        if vec.shape != (self.dimension,):
+            raise ValueError(f"Expected a ({self.dimension},) embedding, got shape {vec.shape}")
+        
+        if self._size == len(self._mat):
+            # Grow geometrically so repeated adds stay amortized O(1)
+            capacity = max(16, 2 * len(self._mat))
+            mat = np.empty((capacity, self.dimension), dtype=self._dtype)
+            norms = np.empty(capacity, dtype=np.float32)
+            mat[:self._size] = self._mat[:self._size]
+            norms[:self._size] = self._norms[:self._size]
+            self._mat, self._norms = mat, norms
+        
+        if self._dtype is np.float16:
+            # Out-of-range values would overflow to inf and turn scores into NaN
+            vec = np.clip(vec, -_FP16_MAX, _FP16_MAX)
+        self._mat[self._size] = vec
+        # Norm of the row as stored, so fp16 rounding does not skew similarities
+        row = self._mat[self._size].astype(np.float32)
+        self._norms[self._size] = np.sqrt(np.vdot(row, row))
+        self._size += 1
+        return self._size - 1
+    
+    def query(self, embedding) -> np.ndarray:
+        """Cosine similarity of embedding against every stored row (0.0 for zero vectors)."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        sims = np.empty(self._size, dtype=np.float32)
+        # Upcast fp16 rows block by block for the matmul (NumPy has no fp16 GEMM with
+        # float32 accumulation); fp32 blocks are views, not copies
+        for start in range(0, self._size, self._BLOCK_ROWS):
+            stop = min(start + self._BLOCK_ROWS, self._size)
+            sims[start:stop] = self._mat[start:stop].astype(np.float32, copy=False) @ vec
+        denom = self._norms[:self._size] * np.sqrt(np.vdot(vec, vec))
+        return np.divide(sims, denom, out=np.zeros_like(sims), where=denom > 0)
+
+
+def build_index(embeddings, dim: int = 384, ef_construction: int = 200, M: int = 16):
+    """
+    Build an HNSW approximate nearest-neighbour index (cosine) over (N, dim) embeddings.
+    An empty input gives an empty index. Requires the optional hnswlib package
+    (pip install hnswlib).
+    """
+    if hnswlib is None:
+        raise ImportError("build_index requires hnswlib (pip install hnswlib)")
+    
+    vecs = np.asarray(embeddings, dtype=np.float32)
+    if vecs.size == 0:
+        vecs = vecs.reshape(0, dim)
+    if vecs.ndim != 2 or vecs.shape[1] != dim:
+        raise ValueError(f"Expected (N, {dim}) embeddings, got shape {vecs.shape}")
+    
+    index = hnswlib.Index(space="cosine", dim=dim)
+    index.init_index(max_elements=max(len(vecs), 1), ef_construction=ef_construction, M=M)
+    if len(vecs):
+        index.add_items(vecs)
+    return index
+
+
+def search_index(index, query, k: int = 10):
+    """
+    Find the k stored rows most similar to query.
+    Returns (row indices, cosine similarities), best match first.
+    """
+    k = min(k, index.get_current_count())
+    if k == 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.float32)
+    
+    labels, distances = index.knn_query(np.asarray(query, dtype=np.float32), k=k)
+    # hnswlib's cosine space reports 1 - similarity
+    return labels[0], 1.0 - distances[0]
 
 
 def get_embedding_dimension() -> int:
-    """Get the dimension of the embedding model."""
-    return 384  # all-MiniLM-L6-v2 dimension
+    """Get the dimension of the embedding model (384 for all-MiniLM-L6-v2)."""
+    return _get_model().get_sentence_embedding_dimension()
@@ -3,10 +3,40 @@ Tagging utilities for agents.
 Extracted from existing LLM functionality.
 """
 
-from typing import List
+from typing import Dict, List
+from collections import Counter
+import csv
+import heapq
+import json
 import re
 
 
+# Common stop words to filter out of keyword extraction
+_STOP_WORDS = frozenset([
+    "the", "and", "for", "that", "with", "from", "this", "have", "has", "had",
+    "was", "were", "are", "you", "your", "his", "her", "its", "but", "not",
+    "out", "about", "into", "they", "their", "them", "who", "what", "when",
+    "where", "why", "how", "will", "would", "can", "could", "should",
+    "between", "after", "before", "over", "under", "onto", "more",
+    "most", "some", "any", "each", "other", "than", "also", "may", "might",
+    "must", "shall", "been", "being"
+])
+
+# Maximal runs of 3+ ASCII letters/digits (shorter runs never match)
+_WORD_RE = re.compile(r"[a-z0-9]{3,}")
+
+# Deletes every ASCII character the r'[^\w\s/-]' cleanup removes, in one C-level pass
+_STRIP_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c.isspace() or c in '_/-')
+))
+
+# Canonical instance per normalized tag, so a recurring vocabulary shares one
+# string object; a plain dict (not sys.intern, whose strings are immortal on
+# 3.12+) that is cleared once it reaches _INTERN_MAX entries
+_INTERN: Dict[str, str] = {}
+_INTERN_MAX = 100_000
+
+
 def normalize_tags(tags) -> List[str]:
     """Normalize tags to consistent format."""
     if not tags:
@@ -14,24 +44,30 @@ def normalize_tags(tags) -> List[str]:
     
     # Handle different input types
     if isinstance(tags, str):
-        # Handle comma-separated string
-        if ',' in tags:
-            tags = [tag.strip() for tag in tags.split(',')]
+        stripped = tags.strip()
         # Handle JSON array string
-        elif tags.startswith('[') and tags.endswith(']'):
+        if stripped.startswith('['):
             try:
-                import json
-                tags = json.loads(tags)
-            except:
-                tags = []
-        # Handle PostgreSQL array string
-        elif tags.startswith('{') and tags.endswith('}'):
-            # Remove braces and split by comma
-            tags = tags[1:-1].split(',')
-            tags = [tag.strip().strip('"') for tag in tags]
+                tags = json.loads(stripped)
+            except ValueError:
+                # A bracketed single value that is not valid JSON is dropped;
+                # anything else is comma-split (or kept as one tag) and cleanup
+                # strips the brackets
+                if stripped.endswith(']') and ',' not in stripped:
+                    tags = []
+                else:
+                    tags = [tag.strip() for tag in stripped.split(',')]
+        # Handle PostgreSQL array string (quoted elements may contain commas)
+        elif stripped.startswith('{') and stripped.endswith('}'):
+            content = stripped[1:-1]
+            try:
+                tags = next(csv.reader([content], skipinitialspace=True, escapechar='\\', strict=True), [])
+            except csv.Error:
+                # Unquoted newlines or unbalanced quotes: plain comma split
+                tags = [tag.strip().strip('"') for tag in content.split(',')]
+        # Handle comma-separated string or a single tag
         else:
-            # Single tag
-            tags = [tags]
+            tags = [tag.strip() for tag in stripped.split(',')]
     
     # If tags is already a list but contains character-by-character split strings,
     # try to reconstruct the original string and parse it properly
@@ -43,7 +79,6 @@ def normalize_tags(tags) -> List[str]:
                 original_string = ''.join(tags)
                 
                 # Try to parse as JSON first
-                import json
                 try:
                     parsed_tags = json.loads(original_string)
                     if isinstance(parsed_tags, list):
@@ -84,58 +119,45 @@ def normalize_tags(tags) -> List[str]:
         if isinstance(tag, str) and tag.strip():
             # Convert to lowercase, remove extra whitespace
             clean_tag = tag.strip().lower()
-            # Replace multiple spaces with single space
-            clean_tag = re.sub(r'\s+', ' ', clean_tag)
-            # Keep forward slashes and hyphens but remove other punctuation
-            clean_tag = re.sub(r'[^\w\s/-]', '', clean_tag)
+            if clean_tag.isascii():
+                # Replace multiple spaces with single space
+                clean_tag = ' '.join(clean_tag.split())
+                # Keep forward slashes and hyphens but remove other punctuation
+                clean_tag = clean_tag.translate(_STRIP_TABLE)
+            else:
+                # Unicode letters/punctuation need the regex's \w semantics
+                clean_tag = re.sub(r'\s+', ' ', clean_tag)
+                clean_tag = re.sub(r'[^\w\s/-]', '', clean_tag)
             if clean_tag and len(clean_tag) > 1:
-                normalized.append(clean_tag)
+                if len(_INTERN) >= _INTERN_MAX:
+                    _INTERN.clear()
+                normalized.append(_INTERN.setdefault(clean_tag, clean_tag))
     
     # Remove duplicates while preserving order
-    seen = set()
-    unique_tags = []
-    for tag in normalized:
-        if tag not in seen:
-            seen.add(tag)
-            unique_tags.append(tag)
-    
-    return unique_tags
+    return list(dict.fromkeys(normalized))
 
 
 def extract_keywords_from_content(content: str, max_tags: int = 10) -> List[str]:
     """Extract keywords from content as fallback tags."""
-    # Remove punctuation and convert to lowercase
-    text = re.sub(r"[^a-zA-Z0-9\s]", " ", content.lower())
-    tokens = [t for t in text.split() if len(t) > 2]
-    
-    # Common stop words to filter out
-    stop_words = set([
-        "the", "and", "for", "that", "with", "from", "this", "have", "has", "had",
-        "was", "were", "are", "you", "your", "his", "her", "its", "but", "not",
-        "out", "about", "into", "they", "their", "them", "who", "what", "when",
-        "where", "why", "how", "will", "would", "can", "could", "should",
-        "between", "after", "before", "over", "under", "into", "onto", "more",
-        "most", "some", "any", "each", "other", "than", "also", "may", "might",
-        "must", "shall", "should", "could", "would", "will", "been", "being"
-    ])
+    # Split on anything but ASCII letters/digits and convert to lowercase
+    # (the regex only yields tokens longer than two characters)
+    freq = Counter(_WORD_RE.findall(content.lower()))
     
-    # Filter out stop words and count frequency (case-insensitive)
-    filtered_tokens = [t for t in tokens if t not in stop_words]
-    freq = {}
-    for token in filtered_tokens:
-        # Use lowercase for frequency counting to ensure case-insensitive deduplication
-        token_lower = token.lower()
-        freq[token_lower] = freq.get(token_lower, 0) + 1
+    # Drop stop words after counting: a few dict pops instead of a per-token set lookup
+    for word in _STOP_WORDS:
+        freq.pop(word, None)
     
-    # Get top keywords by frequency
-    sorted_tokens = sorted(freq.items(), key=lambda x: (-x[1], x[0]))
-    return [token for token, _ in sorted_tokens[:max_tags]]
+    # Get top keywords by frequency, ties alphabetical; a heap avoids sorting every token
+    top_tokens = heapq.nsmallest(max_tags, freq.items(), key=lambda x: (-x[1], x[0]))
+    return [token for token, _ in top_tokens]
 
 
 def merge_tags(existing_tags: List[str], new_tags: List[str], max_total: int = 15) -> List[str]:
     """Merge existing and new tags, removing duplicates and limiting total."""
-    all_tags = existing_tags + new_tags
-    normalized = normalize_tags(all_tags)
+    # Ordered dict union: existing tags keep their positions, new ones append
+    merged = dict.fromkeys(normalize_tags(existing_tags))
+    for tag in normalize_tags(new_tags):
+        merged.setdefault(tag, None)
     
     # Limit total tags
-    return normalized[:max_total]
+    return list(merged)[:max_total]
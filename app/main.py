@@ -3,13 +3,24 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from app.routes.process_input import router as process_input_router
+from app.agents.tools.embedding import _get_model
+from contextlib import asynccontextmanager
 import traceback
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the embedding model at worker startup rather than in the first request."""
+    _get_model()
+    yield
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Merlin - Personal Knowledge Curator",
     description="AI-powered personal knowledge curation system with Strands Agents architecture",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for local development (adjust origins for production)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 from .models import Note  # <-- relative import
 import os
 from dotenv import load_dotenv
@@ -11,18 +11,11 @@ SessionLocal = sessionmaker(bind=engine)
 
 def add_note(title, content, summary, tags, embedding):
     session = SessionLocal()
-    note = Note(
-        title=title,
-        content=content,
-        summary=summary,
-        tags=tags,
-        embedding=embedding
-    )
-    session.add(note)
+    values = dict(title=title, content=content, summary=summary, tags=tags, embedding=embedding)
+    row = session.execute(insert(Note).values(**values).returning(Note.id, Note.created_at)).one()
     session.commit()
-    session.refresh(note)
     session.close()
-    return note
+    return Note(id=row.id, created_at=row.created_at, **values)
 
 def get_all_notes():
     session = SessionLocal()
@@ -1,13 +1,31 @@
-from sentence_transformers import SentenceTransformer
+from typing import List
+from app.agents.tools.embedding import _get_model
 
-# Load a pre-trained embedding model
-# 'all-MiniLM-L6-v2' is lightweight and fast, good for MVP
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# The model and its EMBEDDING_MODEL override are shared with the agents'
+# embedding tool, which loads it on first use
+
+# Above this many texts, bulk_embed fans out across all CPU cores / GPUs
+MULTI_PROCESS_THRESHOLD = 1000
 
 def generate_embedding(text: str):
     """
     Generate a vector embedding for the given text using Hugging Face.
-    Returns a list of floats.
+    Returns a float32 numpy array (pgvector accepts ndarrays directly).
+    """
+    return _get_model().encode([text])[0]  # model.encode returns a list of vectors
+
+def bulk_embed(texts: List[str]):
     """
-    embedding = model.encode([text])[0]  # model.encode returns a list of vectors
-    return embedding.tolist()  # convert numpy array to list for pgvector storage
+    Generate embeddings for a large list of texts (e.g. backfills).
+    Uses a multi-process pool when there are enough texts to amortize its startup.
+    """
+    model = _get_model()
+    if len(texts) <= MULTI_PROCESS_THRESHOLD:
+        return model.encode(texts, batch_size=64)
+
+    pool = model.start_multi_process_pool()
+    try:
+        embeddings = model.encode_multi_process(texts, pool, batch_size=64)
+    finally:
+        model.stop_multi_process_pool(pool)
+    return embeddings
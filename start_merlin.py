@@ -30,12 +30,25 @@ def main():
         print("   Please set these in your .env file or environment")
         print()
     
+    # Auto-reload only in development; production runs several worker processes
+    # (reload and workers are mutually exclusive in uvicorn)
+    dev_mode = os.getenv("ENV") == "dev"
+    default_workers = 1 if dev_mode else max(1, (os.cpu_count() or 2) // 2)
+    workers = int(os.getenv("WORKERS", default_workers))
+    # Worker processes read this to size their embedding thread pools
+    os.environ["WORKERS"] = str(workers)
+    print(f"⚙️  Mode: {'dev (reload)' if dev_mode else f'prod ({workers} workers)'}")
+    
     # Start the FastAPI server
     uvicorn.run(
         "app.main:app",
         host="127.0.0.1",
         port=8002,
-        reload=True,
+        reload=dev_mode,
+        workers=None if dev_mode else workers,
+        # "auto" uses uvloop/httptools when installed (uvicorn[standard]), asyncio/h11 otherwise
+        loop="auto",
+        http="auto",
         log_level="info"
     )
 
@@ -6,7 +6,8 @@ Test script for Merlin v2.0 Strands Agents architecture
 import requests
 import json
 import time
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any
 
 API_URL = "http://127.0.0.1:8002/api/v1"
 
@@ -40,8 +41,9 @@ def test_agents_info():
         print(f"❌ Agents Info: FAILED (Error: {e})")
         return False
 
-def test_agent_processing(input_text: str, expected_agent: str = None) -> Dict[str, Any]:
-    """Test agent processing with given input."""
+def test_agent_processing(input_text: str, expected_agent: str = None,
+                          log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """Test agent processing with given input; status lines go to log."""
     try:
         response = requests.post(
             f"{API_URL}/process",
@@ -54,19 +56,19 @@ def test_agent_processing(input_text: str, expected_agent: str = None) -> Dict[s
             success = result.get("success", False)
             
             if expected_agent and agent_type != expected_agent:
-                print(f"⚠️  Expected agent '{expected_agent}', got '{agent_type}'")
+                log(f"⚠️  Expected agent '{expected_agent}', got '{agent_type}'")
             
             if success:
-                print(f"✅ Processing: PASSED (Agent: {agent_type})")
+                log(f"✅ Processing: PASSED (Agent: {agent_type})")
                 return result
             else:
-                print(f"❌ Processing: FAILED (Agent: {agent_type}, Error: {result.get('error')})")
+                log(f"❌ Processing: FAILED (Agent: {agent_type}, Error: {result.get('error')})")
                 return result
         else:
-            print(f"❌ Processing: FAILED (Status: {response.status_code})")
+            log(f"❌ Processing: FAILED (Status: {response.status_code})")
             return {}
     except Exception as e:
-        print(f"❌ Processing: FAILED (Error: {e})")
+        log(f"❌ Processing: FAILED (Error: {e})")
         return {}
 
 def run_tests():
@@ -118,14 +120,21 @@ def run_tests():
     print("🧪 Testing Agent Processing:")
     print("-" * 40)
     
-    for i, test_case in enumerate(test_cases, 1):
+    # Each case is an independent, I/O-bound request, so dispatch them all at once;
+    # status lines are buffered per case and printed in case order below
+    logs = [[] for _ in test_cases]
+    with ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+        futures = [
+            executor.submit(test_agent_processing, test_case['input'], test_case['expected_agent'], lines.append)
+            for test_case, lines in zip(test_cases, logs)
+        ]
+    
+    for i, (test_case, future, lines) in enumerate(zip(test_cases, futures, logs), 1):
+        result = future.result()
         print(f"\nTest {i}: {test_case['description']}")
         print(f"Input: '{test_case['input'][:50]}{'...' if len(test_case['input']) > 50 else ''}'")
-        
-        result = test_agent_processing(
-            test_case['input'], 
-            test_case['expected_agent']
-        )
+        for line in lines:
+            print(line)
         
         if result.get("success"):
             agent_result = result.get("result", {})
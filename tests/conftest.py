@@ -3,6 +3,7 @@ Pytest configuration and fixtures for Merlin tests.
 """
 
 import pytest
+import pytest_asyncio
 import os
 import tempfile
 from unittest.mock import Mock, patch, MagicMock
@@ -150,14 +151,24 @@ def mock_similarity_score():
     return 0.85
 
 
-@pytest.fixture
-def api_client():
-    """FastAPI test client."""
+@pytest.fixture(scope="session")
+def client():
+    """FastAPI test client, shared by every API test in the session."""
     from app.main import app
     from fastapi.testclient import TestClient
     return TestClient(app)
 
 
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def aclient():
+    """Async client calling the FastAPI app in-process over ASGI (no TestClient thread portal)."""
+    from app.main import app
+    from httpx import AsyncClient, ASGITransport
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    yield client
+    await client.aclose()
+
+
 @pytest.fixture
 def mock_router_agent():
     """Mock router agent for testing."""
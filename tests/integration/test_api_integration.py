@@ -2,20 +2,12 @@
 Integration tests for the Merlin API.
 """
 
-import pytest
 from unittest.mock import patch, Mock
-from fastapi.testclient import TestClient
-from app.main import app
 
 
 class TestAPIIntegration:
     """Integration tests for the complete API workflow."""
 
-    @pytest.fixture
-    def client(self):
-        """Create test client."""
-        return TestClient(app)
-
     def test_root_endpoint(self, client):
         """Test root endpoint."""
         response = client.get("/")
@@ -5,28 +5,86 @@ Comprehensive test runner for Merlin Personal Knowledge Curator.
 
 import os
 import sys
+import time
+import hashlib
+import sysconfig
 import subprocess
 import argparse
+import importlib.util
+from importlib.metadata import distributions
+import json
 from pathlib import Path
 
+try:
+    import pytest
+except ImportError:  # reported by check_test_environment
+    pytest = None  # type: ignore
+
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 
-def run_tests(test_type="all", verbose=False, coverage=False):
-    """Run tests based on the specified type."""
+# Fan tests out across all cores; loadfile keeps each module on one worker
+# so module/class-scoped fixtures are only built once
+PARALLEL_ARGS = ["-n", "auto", "--dist", "loadfile"]
+
+# Skip .pytest_cache writes; only --lf/--ff workflows need them
+NO_CACHE_ARGS = ["-p", "no:cacheprovider"]
+
+# Structured results written by pytest-json-report
+JSON_REPORT_FILE = project_root / ".pytest_report.json"
+
+# Successful environment checks are remembered for a day
+ENV_CHECK_CACHE_DIR = Path.home() / ".cache" / "merlin" / "envcheck"
+ENV_CHECK_TTL = 24 * 60 * 60
+
+# Node ids from the last `pytest --collect-only` of tests/
+NODEIDS_CACHE = project_root / ".pytest_nodeids"
+
+
+def get_cached_node_ids(test_path):
+    """
+    Return collected node ids under test_path, re-collecting tests/ only when
+    a test file or directory is newer than the cache file.
+    """
+    tests_dir = project_root / "tests"
+    newest = max(
+        [tests_dir.stat().st_mtime]
+        + [p.stat().st_mtime for p in tests_dir.rglob("*") if p.is_dir() or p.suffix == ".py"]
+    )
+    
+    if not NODEIDS_CACHE.exists() or NODEIDS_CACHE.stat().st_mtime < newest:
+        print("🔎 Collecting test node ids...")
+        result = subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-q", "tests/"],
+            cwd=project_root, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return None
+        node_ids = [line for line in result.stdout.splitlines() if "::" in line]
+        NODEIDS_CACHE.write_text("\n".join(node_ids))
     
-    # Set up pytest command
-    cmd = ["python3", "-m", "pytest"]
+    return [node_id for node_id in NODEIDS_CACHE.read_text().splitlines() if node_id.startswith(test_path)]
+
+
+def build_pytest_args(test_type="all", verbose=False, coverage=False, parallel=True, use_cache=True,
+                      collect_cache=False):
+    """Build the pytest arguments for the specified test type (None if unknown)."""
+    
+    # Set up pytest arguments
+    cmd = []
     
     # Add verbosity
     if verbose:
         cmd.append("-v")
     
-    # Add coverage
-    if coverage:
-        cmd.extend(["--cov=app", "--cov-report=html", "--cov-report=term"])
+    # Add parallel execution (xdist workers are not traced by `coverage run`)
+    if parallel and not coverage:
+        cmd.extend(PARALLEL_ARGS)
+    
+    if not use_cache:
+        cmd.extend(NO_CACHE_ARGS)
     
     # Select test directory based on type
     if test_type == "unit":
@@ -43,48 +101,111 @@ def run_tests(test_type="all", verbose=False, coverage=False):
         cmd.append("tests/")
     else:
         print(f"Unknown test type: {test_type}")
+        return None
+    
+    # Swap the directory for its previously collected node ids
+    if collect_cache:
+        node_ids = get_cached_node_ids(cmd[-1])
+        if node_ids:
+            cmd = cmd[:-1] + node_ids
+            print(f"📋 Using {len(node_ids)} cached node ids from {NODEIDS_CACHE.name}")
+        else:
+            print("⚠️  Node id collection failed; running the directory instead")
+    
+    return cmd
+
+
+def run_tests(test_type="all", verbose=False, coverage=False, parallel=True, use_cache=True,
+              collect_cache=False, coverage_fast=False):
+    """
+    Run tests based on the specified type.
+    
+    Runs pytest inside this interpreter. With coverage, pytest runs under
+    `coverage run` and the data is combined and reported afterwards;
+    coverage_fast uses the sys.monitoring core (Python 3.12+).
+    """
+    cmd = build_pytest_args(test_type, verbose, coverage, parallel, use_cache, collect_cache)
+    if cmd is None:
         return False
     
     print(f"🧪 Running {test_type} tests...")
-    print(f"Command: {' '.join(cmd)}")
+    print(f"Command: pytest {' '.join(cmd) if len(cmd) < 20 else ' '.join(cmd[:10]) + ' ...'}")
     print("-" * 60)
     
     # Run the tests
     try:
-        result = subprocess.run(cmd, cwd=project_root, capture_output=False)
-        return result.returncode == 0
+        if coverage:
+            return run_with_coverage(cmd, fast=coverage_fast)
+        os.chdir(project_root)
+        return pytest.main(cmd) == 0
     except Exception as e:
         print(f"❌ Error running tests: {e}")
         return False
 
 
-def check_test_environment():
-    """Check if the test environment is properly set up."""
+def run_with_coverage(pytest_args, fast=False):
+    """Run pytest under coverage.py, then combine the data files and report."""
+    env = dict(os.environ)
+    if fast:
+        # sys.monitoring-based tracer, far cheaper than the classic trace function
+        env["COVERAGE_CORE"] = "sysmon"
+    
+    coverage_cmd = [sys.executable, "-m", "coverage"]
+    result = subprocess.run(
+        coverage_cmd + ["run", "--parallel-mode", "--source=app", "-m", "pytest", *pytest_args],
+        cwd=project_root, env=env
+    )
+    for step in (["combine"], ["report"], ["html"]):
+        subprocess.run(coverage_cmd + step, cwd=project_root, env=env)
+    
+    return result.returncode == 0
+
+
+def get_env_check_sentinel():
+    """Sentinel path keyed by the interpreter and its site-packages mtime."""
+    purelib = sysconfig.get_paths()["purelib"]
+    key = hashlib.sha1(f"{sys.executable}:{os.path.getmtime(purelib)}".encode()).hexdigest()
+    return ENV_CHECK_CACHE_DIR / key
+
+
+def check_test_environment(force=False):
+    """
+    Check if the test environment is properly set up.
+    
+    A previous successful check for the same interpreter and installed packages
+    is reused for 24 hours unless force is set.
+    """
+    sentinel = get_env_check_sentinel()
+    if not force and sentinel.exists() and time.time() - sentinel.stat().st_mtime < ENV_CHECK_TTL:
+        print("✅ Test environment check cached (use --force-check to re-run)")
+        return True
+    
     print("🔍 Checking test environment...")
     
     # Check if pytest is available
-    try:
-        subprocess.run(["python3", "-m", "pytest", "--version"], 
-                      capture_output=True, check=True)
-        print("✅ pytest is available")
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    if importlib.util.find_spec("pytest") is None:
         print("❌ pytest is not available. Install with: pip install pytest")
         return False
+    print("✅ pytest is available")
     
     # Check if required packages are available
     required_packages = [
         "pytest",
         "pytest-cov",
+        "pytest-xdist",
+        "pytest-json-report",
+        "coverage",
         "fastapi",
         "pydantic"
     ]
     
+    # One pass over installed distribution metadata, without importing anything
+    installed = {(d.metadata["Name"] or "").lower().replace("_", "-") for d in distributions()}
     missing_packages = []
     for package in required_packages:
-        try:
-            __import__(package.replace("-", "_"))
+        if package in installed:
             print(f"✅ {package} is available")
-        except ImportError:
+        else:
             missing_packages.append(package)
             print(f"❌ {package} is missing")
     
@@ -98,6 +219,7 @@ def check_test_environment():
         "tests/unit/tools",
         "tests/unit/agents", 
         "tests/unit/api",
+        "tests/unit/embeddings",
         "tests/integration"
     ]
     
@@ -109,10 +231,12 @@ def check_test_environment():
             print(f"⚠️  {test_dir} has no test files")
     
     print("✅ Test environment check completed")
+    sentinel.parent.mkdir(parents=True, exist_ok=True)
+    sentinel.touch()
     return True
 
 
-def generate_test_report():
+def generate_test_report(parallel=True, use_cache=True):
     """Generate a comprehensive test report."""
     print("📊 Generating test report...")
     
@@ -123,31 +247,41 @@ def generate_test_report():
         "--cov=app",
         "--cov-report=html",
         "--cov-report=term-missing",
-        "--cov-report=json",
+        "--json-report",
+        f"--json-report-file={JSON_REPORT_FILE}",
         "-v"
     ]
     
+    if parallel:
+        cmd.extend(PARALLEL_ARGS)
+    
+    if not use_cache:
+        cmd.extend(NO_CACHE_ARGS)
+    
     try:
-        result = subprocess.run(cmd, cwd=project_root, capture_output=True, text=True)
+        # Clear the previous run's report so a pytest that exits early isn't reported as current
+        JSON_REPORT_FILE.unlink(missing_ok=True)
+        result = subprocess.run(cmd, cwd=project_root)
+        
+        if not JSON_REPORT_FILE.exists():
+            print(f"❌ pytest wrote no JSON report (exit code {result.returncode}); "
+                  "is pytest-json-report installed?")
+            return False
+        
+        with open(JSON_REPORT_FILE) as f:
+            report = json.load(f)
         
         # Save report to file
         report_file = project_root / "test_report.txt"
         with open(report_file, "w") as f:
-            f.write("Merlin Test Report\n")
-            f.write("=" * 50 + "\n\n")
-            f.write(result.stdout)
-            if result.stderr:
-                f.write("\nErrors:\n")
-                f.write(result.stderr)
+            json.dump(report, f, indent=2)
         
         print(f"✅ Test report saved to: {report_file}")
         
         # Print summary
-        if "passed" in result.stdout:
-            lines = result.stdout.split('\n')
-            for line in lines:
-                if "passed" in line or "failed" in line or "error" in line:
-                    print(f"📈 {line.strip()}")
+        summary = report.get("summary", {})
+        print(f"📈 {summary.get('passed', 0)} passed, {summary.get('failed', 0)} failed, "
+              f"{summary.get('error', 0)} errors")
         
         return result.returncode == 0
         
@@ -175,6 +309,11 @@ def main():
         action="store_true",
         help="Generate coverage report"
     )
+    parser.add_argument(
+        "--coverage-fast",
+        action="store_true",
+        help="Generate coverage report using the sys.monitoring tracer (Python 3.12+)"
+    )
     parser.add_argument(
         "--check",
         action="store_true",
@@ -185,6 +324,40 @@ def main():
         action="store_true",
         help="Generate comprehensive test report"
     )
+    parser.add_argument(
+        "--no-parallel",
+        action="store_true",
+        help="Run tests serially instead of across all CPU cores (pytest-xdist)"
+    )
+    parser.add_argument(
+        "--isolate",
+        action="store_true",
+        help="Replace the runner with a fresh pytest process instead of running in-process"
+    )
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument(
+        "--cache",
+        dest="cache",
+        action="store_true",
+        help="Keep pytest's cache (needed for --lf/--ff workflows)"
+    )
+    cache_group.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Disable pytest's cache writes (default when CI is set)"
+    )
+    parser.set_defaults(cache=not os.environ.get("CI"))
+    parser.add_argument(
+        "--collect-cache",
+        action="store_true",
+        help="Reuse test node ids collected by a previous run (refreshed when tests change)"
+    )
+    parser.add_argument(
+        "--force-check",
+        action="store_true",
+        help="Re-run the environment check even if a recent one succeeded"
+    )
     
     args = parser.parse_args()
     
@@ -192,7 +365,7 @@ def main():
     print("=" * 50)
     
     # Check environment first
-    if not check_test_environment():
+    if not check_test_environment(force=args.force_check or args.check):
         print("❌ Test environment check failed")
         sys.exit(1)
     
@@ -202,14 +375,37 @@ def main():
     
     # Generate report if requested
     if args.report:
-        success = generate_test_report()
+        success = generate_test_report(parallel=not args.no_parallel, use_cache=args.cache)
         sys.exit(0 if success else 1)
     
+    coverage = args.coverage or args.coverage_fast
+    
+    # Nothing to post-process: exec pytest in place of this process rather than
+    # spawning a child and waiting on it
+    if args.isolate and not coverage:
+        cmd = build_pytest_args(
+            test_type=args.type,
+            verbose=args.verbose,
+            parallel=not args.no_parallel,
+            use_cache=args.cache,
+            collect_cache=args.collect_cache
+        )
+        if cmd is None:
+            sys.exit(1)
+        print(f"🧪 Running {args.type} tests in a fresh pytest process...")
+        sys.stdout.flush()
+        os.chdir(project_root)
+        os.execv(sys.executable, [sys.executable, "-m", "pytest", *cmd])
+    
     # Run tests
     success = run_tests(
         test_type=args.type,
         verbose=args.verbose,
-        coverage=args.coverage
+        coverage=coverage,
+        coverage_fast=args.coverage_fast,
+        parallel=not args.no_parallel,
+        use_cache=args.cache,
+        collect_cache=args.collect_cache
     )
     
     if success:
@@ -3,48 +3,60 @@ Unit tests for StrandsIngestionAgent.
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+import numpy as np
+from types import SimpleNamespace
+from pydantic import ValidationError
+from unittest.mock import Mock, patch, MagicMock, DEFAULT
+from app.agents import strands_ingestion_agent as sia
 from app.agents.strands_ingestion_agent import StrandsIngestionAgent, ContentAnalysis
 
 
+@pytest.fixture(scope="class")
+def agent():
+    """Shared agent for tests that only exercise read-only helpers."""
+    with patch.multiple(sia, AnthropicModel=DEFAULT, Agent=DEFAULT):
+        return StrandsIngestionAgent()
+
+
 class TestStrandsIngestionAgent:
     """Test StrandsIngestionAgent class."""
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_initialization(self, mock_agent_class, mock_model_class):
+    @pytest.fixture(autouse=True)
+    def _mock_strands(self):
+        """Patch the Strands classes and pipeline tools once per test."""
+        with patch.multiple(
+            sia,
+            AnthropicModel=DEFAULT,
+            Agent=DEFAULT,
+            fetch_url_content=DEFAULT,
+            normalize_tags=DEFAULT,
+            generate_embedding_np=DEFAULT,
+            add_note=DEFAULT,
+            find_similar_notes=DEFAULT,
+        ) as mocks:
+            mocks['Agent'].return_value = Mock()
+            self.mocks = mocks
+            yield
+
+    def test_initialization(self):
         """Test agent initialization."""
-        # Mock the model and agent
-        mock_model = Mock()
-        mock_agent = Mock()
-        mock_model_class.return_value = mock_model
-        mock_agent_class.return_value = mock_agent
-        
         agent = StrandsIngestionAgent()
         
         assert agent.name == "StrandsIngestionAgent"
         assert agent.description == "AI-powered content ingestion using Strands and Claude"
-        mock_model_class.assert_called_once()
-        mock_agent_class.assert_called_once()
+        self.mocks['AnthropicModel'].assert_called_once()
+        self.mocks['Agent'].assert_called_once()
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_process_ingestion_unknown_action(self, mock_agent_class, mock_model_class):
+    def test_process_ingestion_unknown_action(self):
         """Test processing with unknown action."""
-        mock_agent_class.return_value = Mock()
-        
         agent = StrandsIngestionAgent()
         result = agent.process_ingestion("unknown_action", {})
         
         assert result['success'] is False
         assert 'Unknown ingestion action' in result['error']
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_process_ingestion_exception(self, mock_agent_class, mock_model_class):
+    def test_process_ingestion_exception(self):
         """Test processing with exception."""
-        mock_agent_class.return_value = Mock()
-        
         agent = StrandsIngestionAgent()
         # Mock the _ingest_text method to raise an exception
         with patch.object(agent, '_ingest_text', side_effect=Exception("Test error")):
@@ -53,14 +65,9 @@ class TestStrandsIngestionAgent:
         assert result['success'] is False
         assert 'Ingestion failed: Test error' in result['error']
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    @patch('app.agents.strands_ingestion_agent.fetch_url_content')
-    def test_ingest_url_success(self, mock_fetch_url, mock_agent_class, mock_model_class):
+    def test_ingest_url_success(self):
         """Test successful URL ingestion."""
-        mock_fetch_url.return_value = ("Test Title", "Test Content")
-        mock_agent_class.return_value = Mock()
-        
+        self.mocks['fetch_url_content'].return_value = ("Test Title", "Test Content")
         agent = StrandsIngestionAgent()
         
         with patch.object(agent, '_process_content_with_strands') as mock_process:
@@ -70,42 +77,28 @@ class TestStrandsIngestionAgent:
             result = agent._ingest_url(input_data)
             
             assert result['success'] is True
-            mock_fetch_url.assert_called_once_with('https://example.com')
+            self.mocks['fetch_url_content'].assert_called_once_with('https://example.com')
             mock_process.assert_called_once()
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    @patch('app.agents.strands_ingestion_agent.fetch_url_content')
-    def test_ingest_url_no_url(self, mock_fetch_url, mock_agent_class, mock_model_class):
+    def test_ingest_url_no_url(self):
         """Test URL ingestion without URL."""
-        mock_agent_class.return_value = Mock()
-        
         agent = StrandsIngestionAgent()
         result = agent._ingest_url({})
         
         assert result['success'] is False
         assert 'URL is required' in result['error']
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    @patch('app.agents.strands_ingestion_agent.fetch_url_content')
-    def test_ingest_url_fetch_failure(self, mock_fetch_url, mock_agent_class, mock_model_class):
+    def test_ingest_url_fetch_failure(self):
         """Test URL ingestion with fetch failure."""
-        mock_fetch_url.return_value = (None, None)
-        mock_agent_class.return_value = Mock()
-        
+        self.mocks['fetch_url_content'].return_value = (None, None)
         agent = StrandsIngestionAgent()
         result = agent._ingest_url({'url': 'https://invalid.com'})
         
         assert result['success'] is False
         assert 'Failed to extract content' in result['error']
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_ingest_text_success(self, mock_agent_class, mock_model_class):
+    def test_ingest_text_success(self):
         """Test successful text ingestion."""
-        mock_agent_class.return_value = Mock()
-        
         agent = StrandsIngestionAgent()
         
         with patch.object(agent, '_process_content_with_strands') as mock_process:
@@ -117,57 +110,45 @@ class TestStrandsIngestionAgent:
             assert result['success'] is True
             mock_process.assert_called_once()
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_ingest_text_no_content(self, mock_agent_class, mock_model_class):
+    def test_ingest_text_no_content(self):
         """Test text ingestion without content."""
-        mock_agent_class.return_value = Mock()
-        
         agent = StrandsIngestionAgent()
         result = agent._ingest_text({})
         
         assert result['success'] is False
         assert 'Content is required' in result['error']
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    @patch('app.agents.strands_ingestion_agent.normalize_tags')
-    @patch('app.agents.strands_ingestion_agent.generate_embedding')
-    @patch('app.agents.strands_ingestion_agent.add_note')
-    @patch('app.agents.strands_ingestion_agent.find_similar_notes')
-    def test_process_content_with_strands_success(self, mock_find_similar, mock_add_note, 
-                                                 mock_generate_embedding, mock_normalize_tags,
-                                                 mock_agent_class, mock_model_class):
+    def test_process_content_with_strands_success(self):
         """Test successful content processing with Strands."""
         # Mock the agent and its structured output
         mock_agent = Mock()
-        mock_analysis = Mock()
-        mock_analysis.title = "AI Generated Title"
-        mock_analysis.summary = "AI generated summary"
-        mock_analysis.tags = ["ai", "test"]
-        mock_analysis.content_type = "article"
-        mock_analysis.key_insights = ["Insight 1", "Insight 2"]
+        mock_analysis = SimpleNamespace(
+            title="AI Generated Title",
+            summary="AI generated summary",
+            tags=["ai", "test"],
+            content_type="article",
+            key_insights=["Insight 1", "Insight 2"]
+        )
         mock_agent.structured_output.return_value = mock_analysis
         
-        mock_agent_class.return_value = mock_agent
+        self.mocks['Agent'].return_value = mock_agent
         
         # Mock other dependencies
-        mock_normalize_tags.return_value = ["ai", "test"]
-        mock_generate_embedding.return_value = [0.1, 0.2, 0.3]
-        
-        mock_note = Mock()
-        mock_note.id = 1
-        mock_note.title = "AI Generated Title"
-        mock_note.summary = "AI generated summary"
-        mock_note.tags = ["ai", "test"]
-        mock_note.embedding = [0.1, 0.2, 0.3]
-        # Mock created_at as a datetime object that has isoformat method
-        mock_created_at = Mock()
-        mock_created_at.isoformat.return_value = "2024-01-01T00:00:00"
-        mock_note.created_at = mock_created_at
-        mock_add_note.return_value = mock_note
-        
-        mock_find_similar.return_value = []
+        self.mocks['normalize_tags'].return_value = ["ai", "test"]
+        self.mocks['generate_embedding_np'].return_value = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        
+        # created_at only needs the isoformat method of a datetime
+        mock_note = SimpleNamespace(
+            id=1,
+            title="AI Generated Title",
+            summary="AI generated summary",
+            tags=["ai", "test"],
+            embedding=[0.1, 0.2, 0.3],
+            created_at=SimpleNamespace(isoformat=lambda: "2024-01-01T00:00:00")
+        )
+        self.mocks['add_note'].return_value = mock_note
+        
+        self.mocks['find_similar_notes'].return_value = []
         
         agent = StrandsIngestionAgent()
         result = agent._process_content_with_strands(
@@ -181,38 +162,30 @@ class TestStrandsIngestionAgent:
         assert result['success'] is True
         assert 'AI Generated Title' in result['message']
         mock_agent.structured_output.assert_called_once()
-        mock_add_note.assert_called_once()
+        self.mocks['add_note'].assert_called_once()
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    @patch('app.agents.strands_ingestion_agent.normalize_tags')
-    @patch('app.agents.strands_ingestion_agent.generate_embedding')
-    @patch('app.agents.strands_ingestion_agent.add_note')
-    @patch('app.agents.strands_ingestion_agent.find_similar_notes')
-    def test_process_content_with_strands_fallback(self, mock_find_similar, mock_add_note, mock_generate_embedding,
-                                                 mock_normalize_tags, mock_agent_class, mock_model_class):
+    def test_process_content_with_strands_fallback(self):
         """Test content processing with Strands fallback."""
         # Mock the agent to raise an exception
         mock_agent = Mock()
         mock_agent.structured_output.side_effect = Exception("Strands failed")
-        mock_agent_class.return_value = mock_agent
+        self.mocks['Agent'].return_value = mock_agent
         
         # Mock other dependencies
-        mock_normalize_tags.return_value = []
-        mock_generate_embedding.return_value = [0.1, 0.2, 0.3]
-        mock_find_similar.return_value = []
-        
-        mock_note = Mock()
-        mock_note.id = 1
-        mock_note.title = "Test content"[:80]
-        mock_note.summary = "Test content"[:200]
-        mock_note.tags = []
-        mock_note.embedding = [0.1, 0.2, 0.3]
-        # Mock created_at as a datetime object that has isoformat method
-        mock_created_at = Mock()
-        mock_created_at.isoformat.return_value = "2024-01-01T00:00:00"
-        mock_note.created_at = mock_created_at
-        mock_add_note.return_value = mock_note
+        self.mocks['normalize_tags'].return_value = []
+        self.mocks['generate_embedding_np'].return_value = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        self.mocks['find_similar_notes'].return_value = []
+        
+        # created_at only needs the isoformat method of a datetime
+        mock_note = SimpleNamespace(
+            id=1,
+            title="Test content"[:80],
+            summary="Test content"[:200],
+            tags=[],
+            embedding=[0.1, 0.2, 0.3],
+            created_at=SimpleNamespace(isoformat=lambda: "2024-01-01T00:00:00")
+        )
+        self.mocks['add_note'].return_value = mock_note
         
         agent = StrandsIngestionAgent()
         
@@ -226,20 +199,37 @@ class TestStrandsIngestionAgent:
         
         assert result['success'] is True
         # Should use fallback processing
-        mock_add_note.assert_called_once()
+        self.mocks['add_note'].assert_called_once()
+
+    def test_process_content_passes_embedding_array(self):
+        """Test the embedding ndarray reaches add_note without a list conversion."""
+        self.mocks['Agent'].return_value.structured_output.side_effect = Exception("Strands failed")
+        self.mocks['normalize_tags'].return_value = []
+        embedding = np.zeros(384, dtype=np.float32)
+        self.mocks['generate_embedding_np'].return_value = embedding
+        self.mocks['find_similar_notes'].return_value = []
+        self.mocks['add_note'].return_value = SimpleNamespace(
+            id=1, title="Test content", summary="Test content", tags=[], embedding=embedding,
+            created_at=SimpleNamespace(isoformat=lambda: "2024-01-01T00:00:00")
+        )
+        
+        agent = StrandsIngestionAgent()
+        result = agent._process_content_with_strands(
+            title=None,
+            content="Test content",
+            source_type="text",
+            source_url=None,
+            original_input="Test content"
+        )
+        
+        assert self.mocks['add_note'].call_args.kwargs['embedding'] is embedding
+        assert result['result']['processing_metadata']['embedding_dimension'] == 384
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    @patch('app.agents.strands_ingestion_agent.normalize_tags')
-    @patch('app.agents.strands_ingestion_agent.generate_embedding')
-    @patch('app.agents.strands_ingestion_agent.add_note')
-    def test_process_content_database_error(self, mock_add_note, mock_generate_embedding, mock_normalize_tags,
-                                         mock_agent_class, mock_model_class):
+    def test_process_content_database_error(self):
         """Test content processing with database error."""
-        mock_agent_class.return_value = Mock()
-        mock_normalize_tags.return_value = ["test"]
-        mock_generate_embedding.return_value = [0.1, 0.2, 0.3]
-        mock_add_note.side_effect = Exception("Database error")
+        self.mocks['normalize_tags'].return_value = ["test"]
+        self.mocks['generate_embedding_np'].return_value = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        self.mocks['add_note'].side_effect = Exception("Database error")
         
         agent = StrandsIngestionAgent()
         
@@ -254,41 +244,26 @@ class TestStrandsIngestionAgent:
         assert result['success'] is False
         assert 'Database storage failed' in result['error']
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
     @patch('app.agents.tools.embedding.compute_similarity')
-    def test_calculate_similarity_score_success(self, mock_compute_similarity, mock_agent_class, mock_model_class):
+    def test_calculate_similarity_score_success(self, mock_compute_similarity, agent):
         """Test similarity score calculation success."""
-        mock_agent_class.return_value = Mock()
         mock_compute_similarity.return_value = 0.85
         
-        agent = StrandsIngestionAgent()
-        
         result = agent._calculate_similarity_score([0.1, 0.2], [0.3, 0.4])
         
         assert result == 0.85
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
     @patch('app.agents.tools.embedding.compute_similarity')
-    def test_calculate_similarity_score_failure(self, mock_compute_similarity, mock_agent_class, mock_model_class):
+    def test_calculate_similarity_score_failure(self, mock_compute_similarity, agent):
         """Test similarity score calculation failure."""
-        mock_agent_class.return_value = Mock()
         mock_compute_similarity.side_effect = Exception("Error")
         
-        agent = StrandsIngestionAgent()
-        
         result = agent._calculate_similarity_score([0.1, 0.2], [0.3, 0.4])
         
         assert result == 0.0
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_get_capabilities(self, mock_agent_class, mock_model_class):
+    def test_get_capabilities(self, agent):
         """Test getting agent capabilities."""
-        mock_agent_class.return_value = Mock()
-        
-        agent = StrandsIngestionAgent()
         capabilities = agent.get_capabilities()
         
         assert capabilities['name'] == "StrandsIngestionAgent"
@@ -296,44 +271,18 @@ class TestStrandsIngestionAgent:
         assert capabilities['model'] == 'claude-3-5-haiku-20241022'
         assert 'intelligent_title_generation' in capabilities['ai_features']
 
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_validate_input_url(self, mock_agent_class, mock_model_class):
-        """Test input validation for URL."""
-        mock_agent_class.return_value = Mock()
-        
-        agent = StrandsIngestionAgent()
-        
-        # Valid URL input
-        assert agent.validate_input("ingest_url", {'url': 'https://example.com'}) is True
-        
-        # Invalid URL input
-        assert agent.validate_input("ingest_url", {'url': ''}) is False
-        assert agent.validate_input("ingest_url", {}) is False
-
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_validate_input_text(self, mock_agent_class, mock_model_class):
-        """Test input validation for text."""
-        mock_agent_class.return_value = Mock()
-        
-        agent = StrandsIngestionAgent()
-        
-        # Valid text input
-        assert agent.validate_input("ingest_text", {'content': 'Test content'}) is True
-        
-        # Invalid text input
-        assert agent.validate_input("ingest_text", {'content': ''}) is False
-        assert agent.validate_input("ingest_text", {}) is False
-
-    @patch('app.agents.strands_ingestion_agent.AnthropicModel')
-    @patch('app.agents.strands_ingestion_agent.Agent')
-    def test_validate_input_unknown_action(self, mock_agent_class, mock_model_class):
-        """Test input validation for unknown action."""
-        mock_agent_class.return_value = Mock()
-        
-        agent = StrandsIngestionAgent()
-        assert agent.validate_input("unknown_action", {}) is False
+    @pytest.mark.parametrize("action,data,expected", [
+        ("ingest_url", {'url': 'https://example.com'}, True),
+        ("ingest_url", {'url': ''}, False),
+        ("ingest_url", {}, False),
+        ("ingest_text", {'content': 'Test content'}, True),
+        ("ingest_text", {'content': ''}, False),
+        ("ingest_text", {}, False),
+        ("unknown_action", {}, False),
+    ])
+    def test_validate_input(self, agent, action, data, expected):
+        """Test input validation for each action."""
+        assert agent.validate_input(action, data) is expected
 
 
 class TestContentAnalysis:
@@ -370,3 +319,30 @@ class TestContentAnalysis:
         assert analysis.tags == []
         assert analysis.content_type == "text"
         assert analysis.key_insights == []
+
+    def test_content_analysis_construct_fast(self):
+        """Test model_construct skips validation for already-trusted data."""
+        analysis = ContentAnalysis.model_construct(
+            title="Title",
+            summary="Summary",
+            tags=["test"],
+            content_type="note",
+            key_insights=[]
+        )
+        
+        assert analysis.title == "Title"
+        assert analysis.tags == ["test"]
+        assert analysis == ContentAnalysis(**analysis.model_dump())
+
+    def test_content_analysis_frozen(self):
+        """Test content analysis is immutable."""
+        analysis = ContentAnalysis(
+            title="Title",
+            summary="Summary",
+            tags=[],
+            content_type="text",
+            key_insights=[]
+        )
+        
+        with pytest.raises(ValidationError):
+            analysis.title = "Changed"
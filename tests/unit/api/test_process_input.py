@@ -2,232 +2,162 @@
 Unit tests for process_input API endpoint.
 """
 
+import json
 import pytest
-from unittest.mock import Mock, patch
-from fastapi.testclient import TestClient
-from app.main import app
+from types import SimpleNamespace
+from unittest.mock import create_autospec
+from app.agents.strands_router_agent import StrandsRouterAgent
 from app.routes.process_input import ProcessInputRequest, ProcessInputResponse
 
 
+# Autospecced once; attribute access is checked against StrandsRouterAgent and
+# the mock is reset (not rebuilt) before each test
+_ROUTER_SPEC = create_autospec(StrandsRouterAgent, spec_set=True, instance=True)
+
+# Request bodies shared by several tests, serialized once
+JSON_HEADERS = {"content-type": "application/json"}
+BODY_TEST_CONTENT = b'{"input_text": "This is test content"}'
+BODY_TEST_INPUT = b'{"input_text": "Test input"}'
+
+
+# (agent_attr, method, routing, agent_result, body, expected response fields)
+PROCESS_CASES = [
+    pytest.param(
+        'ingestion', 'process_ingestion',
+        {'input_data': {'content': 'Test content'}},
+        {'success': True, 'result': {'note': {'id': 1, 'title': 'Test Note'}}, 'message': 'Successfully processed'},
+        BODY_TEST_CONTENT,
+        {'success': True, 'agent_type': 'ingestion', 'action': 'ingest_text', 'message': 'Successfully processed'},
+        id="ingestion-success"
+    ),
+    pytest.param(
+        'ingestion', 'process_ingestion',
+        {'input_data': {'content': 'Test content'}},
+        {'success': False, 'error': 'Processing failed'},
+        BODY_TEST_CONTENT,
+        {'success': False, 'error': 'Processing failed'},
+        id="ingestion-failure"
+    ),
+    pytest.param(
+        'query', 'process_query',
+        {'agent_type': 'query', 'action': 'search', 'input_data': {'query': 'What is AI?'},
+         'reasoning': 'Question detected'},
+        {'success': True, 'result': {'results': [{'id': 1, 'title': 'Test Result'}]}, 'message': 'Query processed'},
+        json.dumps({"input_text": "What is artificial intelligence?"}).encode(),
+        {'success': True, 'agent_type': 'query', 'action': 'search'},
+        id="query"
+    ),
+    pytest.param(
+        'summarization', 'process_summarization',
+        {'agent_type': 'summarization', 'action': 'summarize_existing',
+         'input_data': {'content': 'Summarize this content'}, 'reasoning': 'Summarization request detected'},
+        {'success': True, 'result': {'generated_summary': 'Test summary'}, 'message': 'Summary generated'},
+        json.dumps({"input_text": "Summarize this article about AI"}).encode(),
+        {'success': True, 'agent_type': 'summarization', 'action': 'summarize_existing'},
+        id="summarization"
+    ),
+    pytest.param(
+        'ingestion', 'process_ingestion',
+        {'input_data': {'content': 'Test content'}},
+        {'success': True, 'result': {'note': {'id': 1, 'title': 'Test Note'}}, 'message': 'Successfully processed'},
+        json.dumps({"input_text": "This is test content", "user_id": "user123",
+                    "metadata": {"source": "test"}}).encode(),
+        {'success': True},
+        id="metadata"
+    ),
+]
+
+
+@pytest.fixture
+def make_routing():
+    """Factory for router classify_input results."""
+    def _make_routing(agent_type="ingestion", action="ingest_text", input_data=None,
+                      confidence=0.9, reasoning="Text content detected"):
+        return {
+            'agent_type': agent_type,
+            'action': action,
+            'input_data': input_data or {},
+            'confidence': confidence,
+            'reasoning': reasoning
+        }
+    return _make_routing
+
+
+@pytest.mark.asyncio
 class TestProcessInputAPI:
     """Test process input API endpoint."""
 
-    @pytest.fixture
-    def client(self):
-        """Create test client."""
-        return TestClient(app)
+    @pytest.fixture(autouse=True)
+    def agents(self, mocker):
+        """Patch all four route agents once per test."""
+        _ROUTER_SPEC.reset_mock(return_value=True, side_effect=True)
+        return SimpleNamespace(
+            router=mocker.patch('app.routes.process_input.router_agent', _ROUTER_SPEC),
+            ingestion=mocker.patch('app.routes.process_input.ingestion_agent'),
+            query=mocker.patch('app.routes.process_input.query_agent'),
+            summarization=mocker.patch('app.routes.process_input.summarization_agent')
+        )
 
-    @patch('app.routes.process_input.router_agent')
-    @patch('app.routes.process_input.ingestion_agent')
-    def test_process_input_success(self, mock_ingestion_agent, mock_router_agent, client):
-        """Test successful input processing."""
-        # Mock router agent
-        mock_router_agent.classify_input.return_value = {
-            'agent_type': 'ingestion',
-            'action': 'ingest_text',
-            'input_data': {'content': 'Test content'},
-            'confidence': 0.9,
-            'reasoning': 'Text content detected'
-        }
-        mock_router_agent.validate_routing.return_value = True
+    @pytest.mark.parametrize("agent_attr,method,routing,agent_result,body,expected", PROCESS_CASES)
+    async def test_process_input_dispatch(self, agents, aclient, make_routing,
+                                          agent_attr, method, routing, agent_result, body, expected):
+        """Test the router's choice is dispatched to the right agent and its result returned."""
+        agents.router.classify_input.return_value = make_routing(**routing)
+        agents.router.validate_routing.return_value = True
+        getattr(getattr(agents, agent_attr), method).return_value = agent_result
         
-        # Mock ingestion agent
-        mock_ingestion_agent.process_ingestion.return_value = {
-            'success': True,
-            'result': {'note': {'id': 1, 'title': 'Test Note'}},
-            'message': 'Successfully processed'
-        }
-        
-        response = client.post(
-            "/api/v1/process",
-            json={"input_text": "This is test content"}
-        )
+        response = await aclient.post("/api/v1/process", content=body, headers=JSON_HEADERS)
         
         assert response.status_code == 200
         data = response.json()
-        assert data['success'] is True
-        assert data['agent_type'] == 'ingestion'
-        assert data['action'] == 'ingest_text'
-        assert data['message'] == 'Successfully processed'
+        for key, value in expected.items():
+            assert data[key] == value
+        assert data['processing_metadata']['user_id'] == json.loads(body).get('user_id')
 
-    @patch('app.routes.process_input.router_agent')
-    def test_process_input_routing_failure(self, mock_router_agent, client):
+    async def test_process_input_routing_failure(self, agents, aclient):
         """Test input processing with routing failure."""
-        mock_router_agent.classify_input.return_value = {
+        agents.router.classify_input.return_value = {
             'agent_type': 'invalid',
             'action': 'invalid_action',
             'input_data': {},
             'confidence': 0.5
         }
-        mock_router_agent.validate_routing.return_value = False
+        agents.router.validate_routing.return_value = False
         
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/process",
-            json={"input_text": "Test input"}
+            content=BODY_TEST_INPUT, headers=JSON_HEADERS
         )
         
         assert response.status_code == 400
         assert "Invalid routing result" in response.json()['detail']
 
-    @patch('app.routes.process_input.router_agent')
-    @patch('app.routes.process_input.ingestion_agent')
-    def test_process_input_agent_failure(self, mock_ingestion_agent, mock_router_agent, client):
-        """Test input processing with agent failure."""
-        # Mock router agent
-        mock_router_agent.classify_input.return_value = {
-            'agent_type': 'ingestion',
-            'action': 'ingest_text',
-            'input_data': {'content': 'Test content'},
-            'confidence': 0.9,
-            'reasoning': 'Text content detected'
-        }
-        mock_router_agent.validate_routing.return_value = True
-        
-        # Mock ingestion agent failure
-        mock_ingestion_agent.process_ingestion.return_value = {
-            'success': False,
-            'error': 'Processing failed'
-        }
-        
-        response = client.post(
-            "/api/v1/process",
-            json={"input_text": "This is test content"}
+    async def test_process_input_invalid_agent_type(self, agents, aclient, make_routing):
+        """Test input processing with invalid agent type."""
+        agents.router.classify_input.return_value = make_routing(
+            agent_type='invalid_agent', action='some_action', confidence=0.5, reasoning='Test'
         )
+        agents.router.validate_routing.return_value = True
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data['success'] is False
-        assert data['error'] == 'Processing failed'
-
-    @patch('app.routes.process_input.router_agent')
-    @patch('app.routes.process_input.query_agent')
-    def test_process_input_query_agent(self, mock_query_agent, mock_router_agent, client):
-        """Test input processing with query agent."""
-        # Mock router agent
-        mock_router_agent.classify_input.return_value = {
-            'agent_type': 'query',
-            'action': 'search',
-            'input_data': {'query': 'What is AI?'},
-            'confidence': 0.9,
-            'reasoning': 'Question detected'
-        }
-        mock_router_agent.validate_routing.return_value = True
-        
-        # Mock query agent
-        mock_query_agent.process_query.return_value = {
-            'success': True,
-            'result': {'results': [{'id': 1, 'title': 'Test Result'}]},
-            'message': 'Query processed'
-        }
-        
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/process",
-            json={"input_text": "What is artificial intelligence?"}
+            content=BODY_TEST_INPUT, headers=JSON_HEADERS
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data['success'] is True
-        assert data['agent_type'] == 'query'
-        assert data['action'] == 'search'
+        assert response.status_code == 400
+        assert "Unknown agent type" in response.json()['detail']
 
-    @patch('app.routes.process_input.router_agent')
-    @patch('app.routes.process_input.summarization_agent')
-    def test_process_input_summarization_agent(self, mock_summarization_agent, mock_router_agent, client):
-        """Test input processing with summarization agent."""
-        # Mock router agent
-        mock_router_agent.classify_input.return_value = {
-            'agent_type': 'summarization',
-            'action': 'summarize_existing',
-            'input_data': {'content': 'Summarize this content'},
-            'confidence': 0.9,
-            'reasoning': 'Summarization request detected'
-        }
-        mock_router_agent.validate_routing.return_value = True
-        
-        # Mock summarization agent
-        mock_summarization_agent.process_summarization.return_value = {
-            'success': True,
-            'result': {'generated_summary': 'Test summary'},
-            'message': 'Summary generated'
-        }
+    async def test_process_input_internal_error(self, agents, aclient):
+        """Test input processing with internal error."""
+        agents.router.classify_input.side_effect = Exception("Internal error")
         
-        response = client.post(
+        response = await aclient.post(
             "/api/v1/process",
-            json={"input_text": "Summarize this article about AI"}
+            content=BODY_TEST_INPUT, headers=JSON_HEADERS
         )
         
-        assert response.status_code == 200
-        data = response.json()
-        assert data['success'] is True
-        assert data['agent_type'] == 'summarization'
-        assert data['action'] == 'summarize_existing'
-
-    def test_process_input_invalid_agent_type(self, client):
-        """Test input processing with invalid agent type."""
-        with patch('app.routes.process_input.router_agent') as mock_router_agent:
-            mock_router_agent.classify_input.return_value = {
-                'agent_type': 'invalid_agent',
-                'action': 'some_action',
-                'input_data': {},
-                'confidence': 0.5,
-                'reasoning': 'Test'
-            }
-            mock_router_agent.validate_routing.return_value = True
-            
-            response = client.post(
-                "/api/v1/process",
-                json={"input_text": "Test input"}
-            )
-            
-            assert response.status_code == 400
-            assert "Unknown agent type" in response.json()['detail']
-
-    def test_process_input_internal_error(self, client):
-        """Test input processing with internal error."""
-        with patch('app.routes.process_input.router_agent') as mock_router_agent:
-            mock_router_agent.classify_input.side_effect = Exception("Internal error")
-            response = client.post(
-                "/api/v1/process",
-                json={"input_text": "Test input"}
-            )
-            
-            assert response.status_code == 500
-            assert "Internal server error" in response.json()['detail']
-
-    def test_process_input_with_metadata(self, client):
-        """Test input processing with metadata."""
-        with patch('app.routes.process_input.router_agent') as mock_router_agent, \
-             patch('app.routes.process_input.ingestion_agent') as mock_ingestion_agent:
-            
-            mock_router_agent.classify_input.return_value = {
-                'agent_type': 'ingestion',
-                'action': 'ingest_text',
-                'input_data': {'content': 'Test content'},
-                'confidence': 0.9,
-                'reasoning': 'Text content detected'
-            }
-            mock_router_agent.validate_routing.return_value = True
-            
-            mock_ingestion_agent.process_ingestion.return_value = {
-                'success': True,
-                'result': {'note': {'id': 1, 'title': 'Test Note'}},
-                'message': 'Successfully processed'
-            }
-            
-            response = client.post(
-                "/api/v1/process",
-                json={
-                    "input_text": "This is test content",
-                    "user_id": "user123",
-                    "metadata": {"source": "test"}
-                }
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data['success'] is True
-            assert data['processing_metadata']['user_id'] == 'user123'
+        assert response.status_code == 500
+        assert "Internal server error" in response.json()['detail']
 
 
 class TestProcessInputRequest:
@@ -0,0 +1,64 @@
+"""
+Unit tests for the bulk embedding helpers.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import patch
+from embeddings.embed_articles import generate_embedding, bulk_embed, MULTI_PROCESS_THRESHOLD
+
+
+@pytest.fixture
+def mock_model():
+    """Patch the shared embedding model."""
+    with patch('app.agents.tools.embedding.model') as model:
+        yield model
+
+
+class TestGenerateEmbedding:
+    """Test generate_embedding function."""
+
+    def test_generate_embedding_returns_array(self, mock_model):
+        """Test the model's ndarray is returned without a list conversion."""
+        embedding = np.zeros(384, dtype=np.float32)
+        mock_model.encode.return_value = [embedding]
+        
+        result = generate_embedding("Test text")
+        
+        assert result is embedding
+        mock_model.encode.assert_called_once_with(["Test text"])
+
+
+class TestBulkEmbed:
+    """Test bulk_embed function."""
+
+    def test_bulk_embed_small_batch_in_process(self, mock_model):
+        """Test batches up to the threshold are encoded in-process."""
+        texts = ["a", "b", "c"]
+        
+        result = bulk_embed(texts)
+        
+        assert result is mock_model.encode.return_value
+        mock_model.encode.assert_called_once_with(texts, batch_size=64)
+        mock_model.start_multi_process_pool.assert_not_called()
+
+    def test_bulk_embed_large_batch_uses_pool(self, mock_model):
+        """Test batches above the threshold go through a multi-process pool."""
+        texts = ["text"] * (MULTI_PROCESS_THRESHOLD + 1)
+        pool = mock_model.start_multi_process_pool.return_value
+        
+        result = bulk_embed(texts)
+        
+        assert result is mock_model.encode_multi_process.return_value
+        mock_model.encode_multi_process.assert_called_once_with(texts, pool, batch_size=64)
+        mock_model.stop_multi_process_pool.assert_called_once_with(pool)
+        mock_model.encode.assert_not_called()
+
+    def test_bulk_embed_stops_pool_on_error(self, mock_model):
+        """Test the pool is shut down even when encoding fails."""
+        mock_model.encode_multi_process.side_effect = RuntimeError("worker died")
+        
+        with pytest.raises(RuntimeError):
+            bulk_embed(["text"] * (MULTI_PROCESS_THRESHOLD + 1))
+        
+        mock_model.stop_multi_process_pool.assert_called_once()
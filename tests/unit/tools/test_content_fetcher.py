@@ -3,7 +3,7 @@ Unit tests for content_fetcher tool.
 """
 
 import pytest
-from unittest.mock import patch, Mock
+from types import SimpleNamespace
 from app.agents.tools.content_fetcher import (
     fetch_url_content,
     is_url,
@@ -11,106 +11,98 @@ from app.agents.tools.content_fetcher import (
 )
 
 
+def fake_trafilatura(html, text):
+    """Plain stand-in for trafilatura that records the calls it receives."""
+    calls = []
+    
+    def fetch_url(url):
+        calls.append(("fetch_url", url))
+        return html
+    
+    def extract(downloaded, **kwargs):
+        calls.append(("extract", downloaded))
+        return text
+    
+    return SimpleNamespace(fetch_url=fetch_url, extract=extract, calls=calls)
+
+
 class TestFetchUrlContent:
     """Test fetch_url_content function."""
 
-    @patch('app.agents.tools.content_fetcher.trafilatura')
-    def test_fetch_url_content_success(self, mock_trafilatura):
+    def test_fetch_url_content_success(self, monkeypatch):
         """Test successful URL content fetching."""
-        # Mock trafilatura responses
-        mock_trafilatura.fetch_url.return_value = "Mock HTML content"
-        mock_trafilatura.extract.return_value = "Extracted text content"
+        fake = fake_trafilatura("Mock HTML content", "Extracted text content")
+        monkeypatch.setattr("app.agents.tools.content_fetcher.trafilatura", fake)
         
         url = "https://example.com/test"
         title, content = fetch_url_content(url)
         
         assert content == "Extracted text content"
         assert title is None  # trafilatura doesn't return title in plain-text mode
-        mock_trafilatura.fetch_url.assert_called_once_with(url)
-        mock_trafilatura.extract.assert_called_once()
+        assert fake.calls == [("fetch_url", url), ("extract", "Mock HTML content")]
 
-    @patch('app.agents.tools.content_fetcher.trafilatura')
-    def test_fetch_url_content_fetch_failure(self, mock_trafilatura):
+    def test_fetch_url_content_fetch_failure(self, monkeypatch):
         """Test URL fetching failure."""
-        mock_trafilatura.fetch_url.return_value = None
+        fake = fake_trafilatura(None, "Extracted text content")
+        monkeypatch.setattr("app.agents.tools.content_fetcher.trafilatura", fake)
         
         url = "https://invalid-url.com"
         title, content = fetch_url_content(url)
         
         assert title is None
         assert content is None
-        mock_trafilatura.fetch_url.assert_called_once_with(url)
-        mock_trafilatura.extract.assert_not_called()
+        assert fake.calls == [("fetch_url", url)]
 
-    @patch('app.agents.tools.content_fetcher.trafilatura')
-    def test_fetch_url_content_extract_failure(self, mock_trafilatura):
+    def test_fetch_url_content_extract_failure(self, monkeypatch):
         """Test content extraction failure."""
-        mock_trafilatura.fetch_url.return_value = "Mock HTML content"
-        mock_trafilatura.extract.return_value = None
+        fake = fake_trafilatura("Mock HTML content", None)
+        monkeypatch.setattr("app.agents.tools.content_fetcher.trafilatura", fake)
         
         url = "https://example.com/test"
         title, content = fetch_url_content(url)
         
         assert title is None
         assert content is None
-        mock_trafilatura.fetch_url.assert_called_once_with(url)
-        mock_trafilatura.extract.assert_called_once()
+        assert fake.calls == [("fetch_url", url), ("extract", "Mock HTML content")]
 
 
 class TestIsUrl:
     """Test is_url function."""
 
-    def test_is_url_valid_http(self):
-        """Test valid HTTP URL."""
-        assert is_url("http://example.com") is True
-
-    def test_is_url_valid_https(self):
-        """Test valid HTTPS URL."""
-        assert is_url("https://example.com") is True
-
-    def test_is_url_invalid(self):
-        """Test invalid URL."""
-        assert is_url("not a url") is False
-        assert is_url("ftp://example.com") is False
-        assert is_url("example.com") is False
-
-    def test_is_url_empty(self):
-        """Test empty string."""
-        assert is_url("") is False
-
-    def test_is_url_none(self):
-        """Test None input."""
-        assert is_url(None) is False
+    @pytest.mark.parametrize("val,expected", [
+        ("http://example.com", True),
+        ("https://example.com", True),
+        ("not a url", False),
+        ("ftp://example.com", False),
+        ("example.com", False),
+        ("", False),
+        (None, False),
+    ])
+    def test_is_url(self, val, expected):
+        """Test URL detection for valid, invalid, empty and None input."""
+        assert is_url(val) is expected
 
 
 class TestExtractContentFromInput:
     """Test extract_content_from_input function."""
 
-    @patch('app.agents.tools.content_fetcher.fetch_url_content')
-    def test_extract_content_from_url(self, mock_fetch_url):
-        """Test content extraction from URL."""
-        mock_fetch_url.return_value = ("Test Title", "Test Content")
+    @pytest.mark.parametrize("fetched,expected_title,expected_content", [
+        (("Test Title", "Test Content"), "Test Title", "Test Content"),
+        ((None, None), None, None),
+    ], ids=["success", "failure"])
+    def test_extract_content_from_url(self, mocker, fetched, expected_title, expected_content):
+        """Test content extraction from URL, including fetch failure."""
+        mock_fetch_url = mocker.patch('app.agents.tools.content_fetcher.fetch_url_content',
+                                      return_value=fetched)
         
         input_text = "https://example.com/test"
         title, content, input_type = extract_content_from_input(input_text)
         
         assert input_type == "url"
-        assert title == "Test Title"
-        assert content == "Test Content"
+        assert title == expected_title
+        assert content == expected_content
         mock_fetch_url.assert_called_once_with(input_text)
 
-    @patch('app.agents.tools.content_fetcher.fetch_url_content')
-    def test_extract_content_from_url_failure(self, mock_fetch_url):
-        """Test URL content extraction failure."""
-        mock_fetch_url.return_value = (None, None)
-        
-        input_text = "https://invalid-url.com"
-        title, content, input_type = extract_content_from_input(input_text)
-        
-        assert input_type == "url"
-        assert title is None
-        assert content is None
-
     def test_extract_content_from_text(self):
         """Test content extraction from text."""
         input_text = "This is some text content for testing."
@@ -120,23 +112,10 @@ class TestExtractContentFromInput:
         assert title is None
         assert content == input_text
 
-    def test_extract_content_from_empty(self):
-        """Test content extraction from empty input."""
-        input_text = ""
-        title, content, input_type = extract_content_from_input(input_text)
-        
-        assert input_type == "empty"
-        assert title is None
-        assert content is None
-
-    def test_extract_content_from_whitespace(self):
-        """Test content extraction from whitespace-only input."""
-        input_text = "   \n\t   "
-        title, content, input_type = extract_content_from_input(input_text)
-        
-        assert input_type == "empty"
-        assert title is None
-        assert content is None
+    @pytest.mark.parametrize("input_text", ["", "   \n\t   "], ids=["empty", "whitespace"])
+    def test_extract_content_from_empty(self, input_text):
+        """Test content extraction from empty or whitespace-only input."""
+        assert extract_content_from_input(input_text) == (None, None, "empty")
 
     def test_extract_content_strips_whitespace(self):
         """Test that content extraction strips whitespace."""
@@ -7,8 +7,14 @@ import numpy as np
 from unittest.mock import patch, Mock
 from app.agents.tools.embedding import (
     generate_embedding,
+    generate_embedding_np,
     generate_embeddings_batch,
     compute_similarity,
+    compute_similarity_arr,
+    compute_similarity_matrix,
+    EmbeddingStore,
+    build_index,
+    search_index,
     get_embedding_dimension
 )
 
@@ -57,6 +63,17 @@ class TestGenerateEmbedding:
         assert len(result) == 384
         mock_model.encode.assert_called_once_with([text])
 
+    @patch('app.agents.tools.embedding.model')
+    def test_generate_embedding_np_returns_array(self, mock_model):
+        """Test the ndarray variant returns the model output without a list round-trip."""
+        mock_embedding = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        mock_model.encode.return_value = [mock_embedding]
+        
+        result = generate_embedding_np("Test text")
+        
+        assert result is mock_embedding
+        mock_model.encode.assert_called_once_with(["Test text"])
+
 
 class TestGenerateEmbeddingsBatch:
     """Test generate_embeddings_batch function."""
@@ -163,10 +180,21 @@ class TestComputeSimilarity:
         embedding1 = [1.0, 0.0, 0.0]
         embedding2 = [1.0, 0.0, 0.0, 0.0]  # Different dimension
         
-        # This should still work as numpy handles broadcasting
+        # Vectors are truncated to the shorter length before comparing
         result = compute_similarity(embedding1, embedding2)
         
         assert isinstance(result, float)
+        assert abs(result - 1.0) < 1e-6
+
+    @pytest.mark.parametrize("scale", [1e-12, 1e10])
+    def test_compute_similarity_extreme_magnitudes(self, scale):
+        """Test tiny and huge vectors don't under/overflow the norm product."""
+        embedding1 = [scale * x for x in (1.0, 2.0, 3.0)]
+        embedding2 = [scale * x for x in (1.0, 2.0, 2.5)]
+        
+        result = compute_similarity(embedding1, embedding2)
+        
+        assert abs(result - compute_similarity([1.0, 2.0, 3.0], [1.0, 2.0, 2.5])) < 1e-5
 
     def test_compute_similarity_large_vectors(self):
         """Test similarity computation with large vectors."""
@@ -179,11 +207,190 @@ class TestComputeSimilarity:
         assert -1.0 <= result <= 1.0
 
 
+class TestComputeSimilarityArr:
+    """Test compute_similarity_arr function."""
+
+    def test_compute_similarity_arr_matches_list_version(self):
+        """Test the ndarray variant agrees with compute_similarity."""
+        vec1 = np.array([1.0, 1.0, 0.0], dtype=np.float32)
+        vec2 = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        
+        result = compute_similarity_arr(vec1, vec2)
+        
+        assert isinstance(result, float)
+        assert abs(result - compute_similarity(vec1.tolist(), vec2.tolist())) < 1e-6
+
+    def test_compute_similarity_arr_zero_vector(self):
+        """Test the ndarray variant with a zero vector."""
+        assert compute_similarity_arr(np.zeros(3), np.ones(3)) == 0.0
+
+
+class TestComputeSimilarityMatrix:
+    """Test compute_similarity_matrix function."""
+
+    def test_compute_similarity_matrix_large(self):
+        """Test pairwise similarity of two (100, 384) sets matches compute_similarity."""
+        rng = np.random.default_rng(0)
+        embeddings1 = rng.standard_normal((100, 384))
+        embeddings2 = rng.standard_normal((100, 384))
+        
+        result = compute_similarity_matrix(embeddings1, embeddings2)
+        
+        assert result.shape == (100, 100)
+        assert np.all((result >= -1.0 - 1e-5) & (result <= 1.0 + 1e-5))
+        assert abs(result[3, 7] - compute_similarity(embeddings1[3], embeddings2[7])) < 1e-5
+
+    def test_compute_similarity_matrix_zero_row(self):
+        """Test zero rows give zero similarity instead of NaN."""
+        result = compute_similarity_matrix([[0.0, 0.0], [1.0, 0.0]], [[1.0, 0.0]])
+        
+        assert result[0, 0] == 0.0
+        assert abs(result[1, 0] - 1.0) < 1e-6
+
+
+class TestEmbeddingStore:
+    """Test EmbeddingStore class."""
+
+    @patch('app.agents.tools.embedding.model')
+    def test_add_and_query(self, mock_model):
+        """Test texts are embedded on add and ranked by cosine similarity."""
+        mock_model.encode.side_effect = [
+            [np.array([1.0, 0.0, 0.0])],
+            [np.array([0.0, 2.0, 0.0])],
+        ]
+        store = EmbeddingStore(dimension=3)
+        
+        assert store.add("first") == 0
+        assert store.add("second") == 1
+        result = store.query([1.0, 1.0, 0.0])
+        
+        assert len(store) == 2
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, [2 ** -0.5, 2 ** -0.5], rtol=1e-6)
+
+    def test_query_grows_past_initial_capacity(self):
+        """Test many inserts and zero vectors."""
+        store = EmbeddingStore(dimension=384)
+        for i in range(40):
+            store.add_embedding(np.full(384, i, dtype=np.float32))
+        
+        result = store.query([0.1] * 384)
+        
+        assert result.shape == (40,)
+        assert result[0] == 0.0  # zero vector
+        np.testing.assert_allclose(result[1:], 1.0, rtol=1e-6)
+
+    def test_fp16_precision(self):
+        """Test fp16 storage halves memory and queries still return float32."""
+        rng = np.random.default_rng(0)
+        embeddings = rng.standard_normal((10, 384))
+        store16 = EmbeddingStore(precision="fp16")
+        store32 = EmbeddingStore(precision="fp32")
+        for embedding in embeddings:
+            store16.add_embedding(embedding)
+            store32.add_embedding(embedding)
+        
+        result16 = store16.query(embeddings[0])
+        result32 = store32.query(embeddings[0])
+        
+        assert store16._mat.nbytes * 2 == store32._mat.nbytes
+        assert result16.dtype == np.float32
+        np.testing.assert_allclose(result16, result32, atol=1e-3)
+
+    def test_fp16_query_in_blocks(self):
+        """Test blockwise fp16 queries match a single fp32 pass."""
+        rng = np.random.default_rng(1)
+        embeddings = rng.standard_normal((10, 384))
+        store16 = EmbeddingStore(precision="fp16")
+        store16._BLOCK_ROWS = 4
+        store32 = EmbeddingStore(precision="fp32")
+        for embedding in embeddings:
+            store16.add_embedding(embedding)
+            store32.add_embedding(embedding)
+        
+        np.testing.assert_allclose(store16.query(embeddings[3]), store32.query(embeddings[3]), atol=1e-3)
+
+    def test_fp16_clips_out_of_range_values(self):
+        """Test values beyond float16 range are clipped rather than stored as inf."""
+        store = EmbeddingStore(dimension=3, precision="fp16")
+        store.add_embedding([1e6, 0.0, 0.0])
+        
+        result = store.query([1.0, 0.0, 0.0])
+        
+        assert np.isfinite(store._mat[0]).all()
+        np.testing.assert_allclose(result, [1.0], rtol=1e-3)
+
+    @pytest.mark.parametrize("embedding", [[0.5], np.ones(385), np.ones((1, 384))], ids=["short", "long", "2d"])
+    def test_add_embedding_wrong_shape(self, embedding):
+        """Test embeddings that don't match the store's dimension are rejected."""
+        store = EmbeddingStore(dimension=384)
+        
+        with pytest.raises(ValueError, match="384"):
+            store.add_embedding(embedding)
+        assert len(store) == 0
+
+    def test_invalid_precision(self):
+        """Test unknown precision is rejected."""
+        with pytest.raises(ValueError):
+            EmbeddingStore(precision="int8")
+
+
+class TestIndex:
+    """Test build_index and search_index (needs the optional hnswlib)."""
+
+    def test_search_index_matches_exact_similarity(self):
+        """Test the ANN top hit and score agree with compute_similarity_matrix."""
+        pytest.importorskip("hnswlib")
+        rng = np.random.default_rng(0)
+        vecs = rng.standard_normal((200, 384)).astype(np.float32)
+        
+        index = build_index(vecs)
+        labels, sims = search_index(index, vecs[7], k=5)
+        
+        assert len(labels) == 5
+        assert labels[0] == 7
+        assert np.isclose(sims[0], compute_similarity_matrix(vecs[7:8], vecs[7:8])[0, 0], atol=1e-4)
+
+    def test_build_index_empty(self):
+        """Test an empty index can be built and searched."""
+        pytest.importorskip("hnswlib")
+        index = build_index([])
+        labels, sims = search_index(index, np.ones(384, dtype=np.float32))
+        
+        assert len(labels) == 0
+        assert len(sims) == 0
+
+    @pytest.mark.parametrize("embeddings", [np.ones(384), np.ones((3, 10))], ids=["1d", "wrong-dim"])
+    def test_build_index_invalid_shape(self, embeddings):
+        """Test non-(N, dim) input raises a clear ValueError."""
+        pytest.importorskip("hnswlib")
+        with pytest.raises(ValueError, match="Expected"):
+            build_index(embeddings)
+
+
+class TestGetModel:
+    """Test lazy model loading."""
+
+    @patch('app.agents.tools.embedding.model', None)
+    @patch('app.agents.tools.embedding._load_model')
+    def test_model_loaded_once_on_first_use(self, mock_load):
+        """Test the model is built on the first encode call and then reused."""
+        mock_load.return_value.encode.return_value = np.zeros((1, 384), dtype=np.float32)
+        
+        generate_embedding("first")
+        generate_embedding("second")
+        
+        mock_load.assert_called_once()
+        assert mock_load.return_value.encode.call_count == 2
+
+
 class TestGetEmbeddingDimension:
     """Test get_embedding_dimension function."""
 
-    def test_get_embedding_dimension(self):
-        """Test getting embedding dimension."""
+    @patch('app.agents.tools.embedding.model')
+    def test_get_embedding_dimension(self, mock_model):
+        """Test the dimension is read from the loaded model."""
+        mock_model.get_sentence_embedding_dimension.return_value = 384
         result = get_embedding_dimension()
         
         assert isinstance(result, int)
@@ -3,6 +3,7 @@ Unit tests for tagging tool.
 """
 
 import pytest
+from app.agents.tools import tagging
 from app.agents.tools.tagging import (
     normalize_tags,
     extract_keywords_from_content,
@@ -80,6 +81,59 @@ class TestNormalizeTags:
         expected = ["python", "machine learning", "ai"]
         assert result == expected
 
+    def test_normalize_tags_json_array_elements_with_commas(self):
+        """Test JSON array elements keep their commas until cleanup."""
+        tags = '["machine learning", "a,b", "AI"]'
+        result = normalize_tags(tags)
+        
+        expected = ["machine learning", "ab", "ai"]
+        assert result == expected
+
+    def test_normalize_tags_postgres_array_quoted_commas(self):
+        """Test PostgreSQL array elements quoted around commas stay whole."""
+        tags = '{"machine learning","a,b"}'
+        result = normalize_tags(tags)
+        
+        expected = ["machine learning", "ab"]
+        assert result == expected
+
+    @pytest.mark.parametrize("tags,expected", [
+        ("[draft] notes", ["draft notes"]),
+        ("[draft", ["draft"]),
+        ("[draft, notes", ["draft", "notes"]),
+        ("[not json]", []),
+    ])
+    def test_normalize_tags_bracketed_non_json(self, tags, expected):
+        """Test strings starting with '[' that are not JSON arrays."""
+        assert normalize_tags(tags) == expected
+
+    @pytest.mark.parametrize("tags,expected", [
+        ('{\n  ai,\n  machine learning\n}', ["ai", "machine learning"]),
+        ('{ai,\r\nml}', ["ai", "ml"]),
+        ('{a\nb,cd}', ["a b", "cd"]),
+        ('{"ab,cd}', ["ab", "cd"]),
+    ], ids=["multiline", "crlf", "inner-newline", "unbalanced-quote"])
+    def test_normalize_tags_postgres_array_malformed(self, tags, expected):
+        """Test brace strings csv can't parse fall back to a comma split."""
+        assert normalize_tags(tags) == expected
+
+    def test_normalize_tags_reuses_tag_strings(self):
+        """Test equal normalized tags from separate calls share one string object."""
+        first = normalize_tags(["Machine Learning"])[0]
+        second = normalize_tags(["  machine   learning "])[0]
+        
+        assert first == second
+        assert first is second
+
+    def test_normalize_tags_intern_cache_bounded(self, monkeypatch):
+        """Test the tag cache is cleared once it reaches its size limit."""
+        monkeypatch.setattr(tagging, "_INTERN", {})
+        monkeypatch.setattr(tagging, "_INTERN_MAX", 3)
+        
+        normalize_tags(["aa", "bb", "cc", "dd"])
+        
+        assert len(tagging._INTERN) <= 3
+
 
 class TestExtractKeywordsFromContent:
     """Test extract_keywords_from_content function."""